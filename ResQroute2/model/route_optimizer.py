@@ -144,11 +144,11 @@ def get_optimized_route(source, destination):
 # ======================================================
 # 6️⃣ Plot the route on a map with a green polyline
 # ======================================================
-def plot_route_on_map(route_info):
-    if "error" in route_info:
-        print(f"Error: {route_info['error']}")
-        return
-
+def get_route_points(route_info):
+    """
+    Returns the route as a list of (latitude, longitude) points.
+    Falls back to a straight source -> destination line if the geometry can't be read.
+    """
     geometry = route_info["polyline"]
 
     # Determine if geometry is GeoJSON (dict) or an encoded polyline (str)
@@ -166,6 +166,14 @@ def plot_route_on_map(route_info):
 
     if not route_points or len(route_points) == 0:
         route_points = [route_info["source_coords"], route_info["dest_coords"]]
+    return route_points
+
+def plot_route_on_map(route_info):
+    if "error" in route_info:
+        print(f"Error: {route_info['error']}")
+        return
+
+    route_points = get_route_points(route_info)
 
     # Create a Folium map centered at the midpoint of the route
     midpoint = route_points[len(route_points) // 2]
@@ -0,0 +1,86 @@
+from traffic_network_sim import (
+    BLOCK_LENGTH_M,
+    CLEARANCE_TIME_S,
+    TrafficNetworkSimulator,
+    grid_shape_for,
+    route_to_grid_path,
+    run_load_test,
+    synthetic_grid_paths,
+)
+
+
+def straight_road_points(length_m=5000, wiggle_m=20, lat=28.6, lng=77.2):
+    """East-west road with small sideways wiggles, like a real polyline."""
+    points = []
+    for i in range(101):
+        east_m = length_m * i / 100
+        north_m = wiggle_m if i % 2 else 0
+        points.append((lat + north_m / 111195, lng + east_m / (111195 * 0.8778)))
+    return points
+
+
+def test_straight_route_stays_straight():
+    points = straight_road_points()
+    origin = (max(p[0] for p in points), min(p[1] for p in points))
+    path = route_to_grid_path(points, origin)
+
+    assert len({row for row, _ in path}) == 1
+    assert [col for _, col in path] == list(range(len(path)))
+    assert len(path) - 1 == round(5000 / BLOCK_LENGTH_M)
+
+
+def test_lone_ambulance_with_preemption_never_waits():
+    path = [(0, col) for col in range(6)] + [(row, 5) for row in range(1, 6)]
+    paths = [(path, 15.0)]
+    sim = TrafficNetworkSimulator(paths, [100.0], grid_shape=grid_shape_for(paths),
+                                  duration=600, preemption=True, car_arrival_rate=0)
+    result = sim.run()
+
+    assert result["ambulances_finished"] == 1
+    assert result["ambulance_signal_wait_s"] == 0.0
+
+
+def test_request_during_clearance_keeps_pending_green():
+    node = (0, 0)
+    sim = TrafficNetworkSimulator([], [], grid_shape=(1, 1), duration=CLEARANCE_TIME_S + 1,
+                                  car_arrival_rate=0)
+    sim.switch_to(node, "NS")
+    sim.now = 1.0
+    sim.on_preempt_request(node, "NS")
+    sim.run()
+
+    signal = sim.signals[node]
+    assert signal["green"] == "NS"
+    assert signal["green_since"] == CLEARANCE_TIME_S
+    assert sim.event_counts["GREEN_START"] == 1
+
+
+def test_preemption_metrics_on_loaded_grid():
+    path = [(2, col) for col in range(6)] + [(row, 5) for row in range(3, 6)]
+    results = run_load_test([(path, 15.0)], 1, grid_shape=(6, 6), duration=900, seed=3,
+                            car_arrival_rate=0.08)
+    baseline, preempt = results["baseline"], results["preemption"]
+
+    assert results["cross_traffic_delay_added_s"] > 0
+    saved = baseline["ambulance_signal_wait_s"] - preempt["ambulance_signal_wait_s"]
+    assert abs(results["ambulance_time_saved_total_s"] - saved) < 1e-6
+
+
+def test_grid_fits_route_bounding_box():
+    path = [(0, col) for col in range(26)]
+
+    assert grid_shape_for([(path, 15.0)]) == (1, 26)
+
+
+def test_load_test_finishes_every_ambulance():
+    results = run_load_test(synthetic_grid_paths(20, grid_size=6), 60, grid_shape=(6, 6), duration=900)
+
+    for run in ("baseline", "preemption"):
+        assert results[run]["ambulances_finished"] == 60
+    assert results["preemption"]["ambulance_signal_wait_s"] <= results["baseline"]["ambulance_signal_wait_s"]
+
+
+def test_grid_must_fit_routes():
+    results = run_load_test(synthetic_grid_paths(5, grid_size=8), 5, grid_shape=(4, 8))
+
+    assert "error" in results